@@ -1,43 +1,60 @@
 """mDNS discovery for finding Deck-Link peers on the local network."""
 
 import asyncio
+import functools
+import ipaddress
 import socket
 import logging
+import time
 from dataclasses import dataclass, field
-from typing import Callable, Optional
-from zeroconf import Zeroconf, ServiceInfo, ServiceBrowser, ServiceListener  # type: ignore
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional
+from zeroconf import IPVersion, Zeroconf, ServiceInfo, ServiceListener  # type: ignore
+from zeroconf.asyncio import (  # type: ignore
+    AsyncServiceBrowser,
+    AsyncServiceInfo,
+    AsyncZeroconf,
+)
 
 from . import PORT, SERVICE_TYPE, SERVICE_NAME
 
 logger = logging.getLogger(__name__)
 
+# How long to wait for a service to answer a resolve request (milliseconds)
+RESOLVE_TIMEOUT_MS = 3000
 
-@dataclass
+# How long a detected local IP is trusted before probing again (seconds)
+_LOCAL_IP_TTL = 30.0
+
+
+@dataclass(slots=True, frozen=True)
 class DiscoveredPeer:
     """A discovered Deck-Link peer on the network."""
 
     name: str
     host: str
     port: int
-    addresses: list[str] = field(default_factory=list)
-    properties: dict[str, str] = field(default_factory=dict)
-
-    @property
-    def display_name(self) -> str:
-        """Human-readable name for the peer."""
-        return self.properties.get("device_name", self.name)
-
-    @property
-    def device_type(self) -> str:
-        """Type of device (laptop or deck)."""
-        return self.properties.get("device_type", "unknown")
+    display_name: str  # Human-readable name for the peer
+    device_type: str = "unknown"  # Type of device (laptop or deck)
+    addresses: tuple[str, ...] = ()
+    # Read-only view; left out of the hash since mappings are unhashable
+    properties: Mapping[str, str] = field(
+        default_factory=lambda: MappingProxyType({}), hash=False
+    )
+    server: str = ""  # mDNS hostname, kept for logging
 
 
 class PeerDiscoveryListener(ServiceListener):
-    """Listener for mDNS service discovery events."""
+    """
+    Listener for mDNS service discovery events.
+
+    Service lookups run as background tasks on the given event loop so the
+    zeroconf dispatcher never blocks waiting on a network round-trip.
+    """
 
     def __init__(
         self,
+        loop: asyncio.AbstractEventLoop,
         on_peer_found: Optional[Callable[[DiscoveredPeer], None]] = None,
         on_peer_lost: Optional[Callable[[str], None]] = None,
     ):
@@ -45,34 +62,108 @@ class PeerDiscoveryListener(ServiceListener):
         self.on_peer_found = on_peer_found
         self.on_peer_lost = on_peer_lost
 
+        self._loop = loop
+        # Set by cancel(); events queued after it start no new lookups
+        self._closed = False
+        # In-flight lookup per service name
+        self._pending: dict[str, asyncio.Task[None]] = {}
+        # Raw record contents last seen per service, to skip no-op refreshes
+        self._fingerprints: dict[str, tuple[Any, ...]] = {}
+
     def add_service(self, zc: Zeroconf, service_type: str, name: str) -> None:
         """Called when a new service is discovered."""
-        info = zc.get_service_info(service_type, name)
-        if info:
-            self._handle_service_info(name, info)
+        self._loop.call_soon_threadsafe(self._schedule_resolve, zc, service_type, name)
 
     def update_service(self, zc: Zeroconf, service_type: str, name: str) -> None:
         """Called when a service is updated."""
-        info = zc.get_service_info(service_type, name)
-        if info:
-            self._handle_service_info(name, info)
+        self._loop.call_soon_threadsafe(self._schedule_resolve, zc, service_type, name)
 
     def remove_service(self, zc: Zeroconf, service_type: str, name: str) -> None:
         """Called when a service is removed."""
+        self._loop.call_soon_threadsafe(self._remove, name)
+
+    def cancel(self) -> None:
+        """Cancel any lookups that are still in flight."""
+        self._closed = True
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+
+    def _schedule_resolve(self, zc: Zeroconf, service_type: str, name: str) -> None:
+        """Start a background lookup, replacing one still running for the name."""
+        if self._closed:
+            return
+        previous = self._pending.pop(name, None)
+        if previous:
+            previous.cancel()
+        task = self._loop.create_task(self._resolve(zc, service_type, name))
+        self._pending[name] = task
+        task.add_done_callback(functools.partial(self._resolve_done, name))
+
+    def _resolve_done(self, name: str, task: asyncio.Task[None]) -> None:
+        """Drop the reference to a finished lookup."""
+        if self._pending.get(name) is task:
+            del self._pending[name]
+
+    def _remove(self, name: str) -> None:
+        """Forget a removed service, abandoning any lookup still in flight."""
+        task = self._pending.pop(name, None)
+        if task:
+            # Otherwise it would put the peer back once it finished
+            task.cancel()
+
+        self._fingerprints.pop(name, None)
         if name in self.peers:
             del self.peers[name]
-            logger.info(f"Peer lost: {name}")
+            logger.info("Peer lost: %s", name)
             if self.on_peer_lost:
                 self.on_peer_lost(name)
 
+    async def _resolve(self, zc: Zeroconf, service_type: str, name: str) -> None:
+        """Look up a service's details without blocking the dispatcher."""
+        info = AsyncServiceInfo(service_type, name)
+        try:
+            found = await info.async_request(zc, RESOLVE_TIMEOUT_MS)
+        except Exception as e:
+            # Expected if zeroconf shuts down while the lookup is queued
+            log = logger.debug if self._closed else logger.warning
+            log("Lookup of %s failed: %r", name, e)
+            return
+        if found:
+            self._handle_service_info(name, info)
+
     def _handle_service_info(self, name: str, info: ServiceInfo) -> None:
         """Process discovered service info."""
-        addresses = []
-        for addr in info.addresses:
+        raw_addresses = info.addresses_by_version(IPVersion.All)
+        fingerprint = (
+            info.server,
+            info.port,
+            tuple(raw_addresses),
+            tuple(info.properties.items()),
+        )
+        if self._fingerprints.get(name) == fingerprint:
+            # Announce refresh with nothing new; keep the existing peer
+            return
+        self._fingerprints[name] = fingerprint
+
+        ipv4: list[str] = []
+        ipv6: list[str] = []
+        for addr in raw_addresses:
             try:
-                addresses.append(socket.inet_ntoa(addr))
-            except Exception:
-                pass
+                ip = ipaddress.ip_address(addr).compressed
+            except ValueError:
+                continue
+            (ipv4 if len(addr) == 4 else ipv6).append(ip)
+        addresses = (*ipv4, *ipv6)
+
+        # Prefer a literal address so connecting needs no hostname lookup;
+        # IPv4 first since the server listens on 0.0.0.0
+        if ipv4:
+            host = ipv4[0]
+        elif ipv6:
+            host = ipv6[0]
+        else:
+            host = info.server or ""
 
         properties = {}
         for k, v in info.properties.items():
@@ -82,14 +173,31 @@ class PeerDiscoveryListener(ServiceListener):
 
         peer = DiscoveredPeer(
             name=name,
-            host=info.server or (addresses[0] if addresses else ""),
+            host=host,
             port=info.port,
+            display_name=properties.get("device_name", name),
+            device_type=properties.get("device_type", "unknown"),
             addresses=addresses,
-            properties=properties,
+            properties=MappingProxyType(properties),
+            server=info.server or "",
         )
 
+        if name in self.peers:
+            # Changed announcement from a known peer; can be frequent
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Peer updated: %s at %s:%d (server %s, addresses %s)",
+                    peer.display_name,
+                    peer.host,
+                    peer.port,
+                    peer.server,
+                    peer.addresses,
+                )
+        else:
+            logger.info(
+                "Peer found: %s at %s:%d", peer.display_name, peer.host, peer.port
+            )
         self.peers[name] = peer
-        logger.info(f"Peer found: {peer.display_name} at {peer.host}:{peer.port}")
 
         if self.on_peer_found:
             self.on_peer_found(peer)
@@ -99,7 +207,8 @@ class Discovery:
     """
     Manages mDNS service advertisement and discovery.
 
-    Uses synchronous zeroconf to avoid async compatibility issues.
+    Registration runs on the event loop via AsyncZeroconf, so the broadcast
+    spacing never ties up an executor thread.
     """
 
     def __init__(
@@ -116,35 +225,45 @@ class Discovery:
         self.on_peer_found = on_peer_found
         self.on_peer_lost = on_peer_lost
 
-        self._zeroconf: Optional[Zeroconf] = None
-        self._browser: Optional[ServiceBrowser] = None
+        self._aiozc: Optional[AsyncZeroconf] = None
+        self._browser: Optional[AsyncServiceBrowser] = None
         self._service_info: Optional[ServiceInfo] = None
         self._listener: Optional[PeerDiscoveryListener] = None
         self._running = False
+        self._local_ip_cache: Optional[tuple[float, str]] = None
+
+        # Our own advertisement shows up in the browse results too
+        self._self_prefix = f"{device_name}."
+        self._external_peers: dict[str, DiscoveredPeer] = {}
 
     def _get_local_ip(self) -> str:
-        """Get the local IP address."""
+        """Get the local IP address, reusing a recent probe when possible."""
+        now = time.monotonic()
+        if self._local_ip_cache and now - self._local_ip_cache[0] < _LOCAL_IP_TTL:
+            return self._local_ip_cache[1]
+
         try:
             s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             s.connect(("8.8.8.8", 80))
             ip = s.getsockname()[0]
             s.close()
-            return ip
         except Exception:
+            # Not cached, so the next call retries once the network is up
             return "127.0.0.1"
 
+        self._local_ip_cache = (now, ip)
+        return ip
+
+    def invalidate_local_ip(self) -> None:
+        """Forget the cached local IP so the next lookup probes again."""
+        self._local_ip_cache = None
+
     async def start(self) -> None:
         """Start advertising this service and browsing for peers."""
         if self._running:
             return
 
-        # Run zeroconf setup in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self._start_sync)
-
-    def _start_sync(self) -> None:
-        """Synchronous startup of zeroconf."""
-        self._zeroconf = Zeroconf()
+        self._aiozc = AsyncZeroconf()
 
         # Create service info for advertising
         local_ip = self._get_local_ip()
@@ -163,20 +282,21 @@ class Discovery:
         )
 
         # Register our service
-        self._zeroconf.register_service(self._service_info)
-        logger.info(f"Advertising as {service_name} on {local_ip}:{self.port}")
+        await self._aiozc.async_register_service(self._service_info)
+        logger.info("Advertising as %s on %s:%d", service_name, local_ip, self.port)
 
         # Set up listener for peer discovery
         self._listener = PeerDiscoveryListener(
+            asyncio.get_running_loop(),
             on_peer_found=self._on_peer_found,
-            on_peer_lost=self.on_peer_lost,
+            on_peer_lost=self._on_peer_lost,
         )
 
         # Start browsing for peers
-        self._browser = ServiceBrowser(
-            self._zeroconf,
+        self._browser = AsyncServiceBrowser(
+            self._aiozc.zeroconf,
             SERVICE_TYPE,
-            self._listener,
+            listener=self._listener,
         )
 
         self._running = True
@@ -184,46 +304,46 @@ class Discovery:
 
     def _on_peer_found(self, peer: DiscoveredPeer) -> None:
         """Filter out self from discovered peers."""
-        if peer.name.startswith(self.device_name):
+        if peer.name.startswith(self._self_prefix):
             return
+        self._external_peers[peer.name] = peer
         if self.on_peer_found:
             self.on_peer_found(peer)
 
+    def _on_peer_lost(self, name: str) -> None:
+        """Drop a lost peer from the external peer list."""
+        if self._external_peers.pop(name, None) is None:
+            return
+        if self.on_peer_lost:
+            self.on_peer_lost(name)
+
     async def stop(self) -> None:
         """Stop advertising and browsing."""
         if not self._running:
             return
 
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self._stop_sync)
-
-    def _stop_sync(self) -> None:
-        """Synchronous shutdown of zeroconf."""
         if self._browser:
-            self._browser.cancel()
+            await self._browser.async_cancel()
             self._browser = None
 
-        if self._service_info and self._zeroconf:
-            self._zeroconf.unregister_service(self._service_info)
+        if self._listener:
+            self._listener.cancel()
+        self._external_peers.clear()
+
+        if self._service_info and self._aiozc:
+            await self._aiozc.async_unregister_service(self._service_info)
             self._service_info = None
 
-        if self._zeroconf:
-            self._zeroconf.close()
-            self._zeroconf = None
+        if self._aiozc:
+            await self._aiozc.async_close()
+            self._aiozc = None
 
         self._running = False
         logger.info("Discovery stopped")
 
     def get_peers(self) -> list[DiscoveredPeer]:
         """Get list of currently discovered peers."""
-        if not self._listener:
-            return []
-
-        return [
-            peer
-            for peer in self._listener.peers.values()
-            if not peer.name.startswith(self.device_name)
-        ]
+        return list(self._external_peers.values())
 
     def get_local_info(self) -> dict:
         """Get local service info for display."""
@@ -235,23 +355,106 @@ class Discovery:
         }
 
 
+# Zeroconf instance shared by one-shot scans, created on first use so that
+# repeated scans skip the socket setup and multicast warm-up. An owner task on
+# the same loop closes it, so it never outlives that loop.
+_shared_aiozc: Optional[AsyncZeroconf] = None
+_shared_owner: Optional[asyncio.Task[None]] = None
+# Guards the shared instance; an asyncio.Lock belongs to one event loop, so
+# a new one is made whenever the running loop changes
+_shared_lock: Optional[asyncio.Lock] = None
+_shared_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _shared_zeroconf_lock() -> asyncio.Lock:
+    """Return the lock guarding the shared instance for the running loop."""
+    global _shared_lock, _shared_lock_loop
+
+    loop = asyncio.get_running_loop()
+    if _shared_lock is None or _shared_lock_loop is not loop:
+        _shared_lock = asyncio.Lock()
+        _shared_lock_loop = loop
+    return _shared_lock
+
+
+async def _hold_shared_zeroconf(aiozc: AsyncZeroconf) -> None:
+    """
+    Keep the shared instance open until cancelled, then close it.
+    asyncio.run() cancels leftover tasks before closing its loop, so the
+    instance is closed even if close_shared_zeroconf() is never called.
+    """
+    global _shared_aiozc, _shared_owner
+
+    try:
+        await asyncio.get_running_loop().create_future()
+    finally:
+        if _shared_aiozc is aiozc:
+            _shared_aiozc = None
+            _shared_owner = None
+        await aiozc.async_close()
+
+
+def _drop_stale_shared_zeroconf(loop: asyncio.AbstractEventLoop) -> None:
+    """Release a shared instance left behind by another event loop."""
+    global _shared_aiozc, _shared_owner
+
+    if _shared_aiozc is None or _shared_aiozc.zeroconf.loop is loop:
+        return
+    # Its loop ended without running the owner task's cleanup; close what
+    # can still be closed without that loop
+    _shared_aiozc.zeroconf.close()
+    _shared_aiozc = None
+    _shared_owner = None
+
+
+async def _get_shared_zeroconf() -> AsyncZeroconf:
+    """Return the shared zeroconf instance, creating it if needed."""
+    global _shared_aiozc, _shared_owner
+
+    async with _shared_zeroconf_lock():
+        loop = asyncio.get_running_loop()
+        _drop_stale_shared_zeroconf(loop)
+        if _shared_aiozc is None:
+            _shared_aiozc = AsyncZeroconf()
+            _shared_owner = loop.create_task(_hold_shared_zeroconf(_shared_aiozc))
+        return _shared_aiozc
+
+
+async def close_shared_zeroconf() -> None:
+    """Close the zeroconf instance shared by one-shot scans."""
+    async with _shared_zeroconf_lock():
+        _drop_stale_shared_zeroconf(asyncio.get_running_loop())
+        owner = _shared_owner
+        if owner is not None:
+            owner.cancel()
+            await asyncio.gather(owner, return_exceptions=True)
+
+
 async def discover_peers_once(timeout: float = 3.0) -> list[DiscoveredPeer]:
     """Quick one-shot discovery of peers."""
-    peers: list[DiscoveredPeer] = []
+    peers: dict[str, DiscoveredPeer] = {}
 
     def on_found(peer: DiscoveredPeer) -> None:
-        peers.append(peer)
+        peers[peer.name] = peer
+
+    def on_lost(name: str) -> None:
+        peers.pop(name, None)
 
-    discovery = Discovery(
-        device_name=f"scanner-{socket.gethostname()}",
+    aiozc = await _get_shared_zeroconf()
+    listener = PeerDiscoveryListener(
+        asyncio.get_running_loop(),
         on_peer_found=on_found,
+        on_peer_lost=on_lost,
     )
+    browser = AsyncServiceBrowser(aiozc.zeroconf, SERVICE_TYPE, listener=listener)
 
-    await discovery.start()
-    await asyncio.sleep(timeout)
-    await discovery.stop()
+    try:
+        await asyncio.sleep(timeout)
+    finally:
+        await browser.async_cancel()
+        listener.cancel()
 
-    return peers
+    return list(peers.values())
 
 
 if __name__ == "__main__":
@@ -260,6 +463,7 @@ if __name__ == "__main__":
         logging.basicConfig(level=logging.INFO)
         print("Scanning for Deck-Link peers...")
         peers = await discover_peers_once(timeout=5.0)
+        await close_shared_zeroconf()
 
         if peers:
             print(f"\nFound {len(peers)} peer(s):")
@@ -1,13 +1,15 @@
 """Main entry point for Deck-Link CLI and IPC server."""
 
 import asyncio
-import json
 import logging
+import os
+import signal
 import socket
 import sys
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
 
 import click
+import msgspec
 
 from . import PORT
 from .server import DeckLinkServer
@@ -18,6 +20,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Maximum bytes taken from stdin per read
+STDIN_READ_SIZE = 65536
+# Events emitted within this window share a single stdout write (seconds)
+EVENT_FLUSH_INTERVAL = 0.001
+# Flush early once this many events are waiting
+EVENT_BATCH_MAX = 64
+# Handshake events the UI reacts to immediately; these skip the batch window
+IMMEDIATE_EVENTS = frozenset(
+    {
+        "challenge_generated",
+        "passphrase_required",
+        "auth_failed",
+        "connected",
+        "disconnected",
+    }
+)
+
+
+class RpcFrame(msgspec.Struct):
+    """A JSON-RPC command frame received from Tauri."""
+
+    method: str = ""
+    params: dict[str, Any] = {}
+    id: int | str | None = None
+
 
 class JsonRpcServer:
     """
@@ -32,97 +59,207 @@ class JsonRpcServer:
         self.discovery = discovery
         self._running = False
 
+        self._handlers: dict[str, Callable[[dict[str, Any]], Awaitable[Any]]] = {
+            "get_status": self._h_get_status,
+            "get_peers": self._h_get_peers,
+            "connect": self._h_connect,
+            "submit_passphrase": self._h_submit_passphrase,
+            "disconnect": self._h_disconnect,
+            "send_notification": self._h_send_notification,
+            "ping": self._h_ping,
+        }
+
+        # Events are buffered briefly so bursts share one stdout write;
+        # responses flush the buffer first to keep output in order.
+        self._stdout = sys.stdout.buffer
+        self._pending_events: list[bytes] = []
+        self._events_ready = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task[None]] = None
+
+        # Stdin is read straight into one reusable buffer; each complete line
+        # is parsed in place and queued as a command (or the parse error).
+        self._stdin_buf = bytearray()
+        self._commands: asyncio.Queue[Optional[RpcFrame | Exception]] = asyncio.Queue()
+        self._decoder = msgspec.json.Decoder(RpcFrame)
+        self._encoder = msgspec.json.Encoder()
+
     async def start(self) -> None:
         """Start listening for commands on stdin."""
         self._running = True
+        self._flush_task = asyncio.create_task(self._flush_events())
 
         # Make stdin non-blocking
-        loop = asyncio.get_event_loop()
-        reader = asyncio.StreamReader()
-        protocol = asyncio.StreamReaderProtocol(reader)
-        await loop.connect_read_pipe(lambda: protocol, sys.stdin)
+        loop = asyncio.get_running_loop()
+        fd = sys.stdin.fileno()
+        os.set_blocking(fd, False)
+        loop.add_reader(fd, self._on_stdin_readable, loop, fd)
 
         while self._running:
             try:
-                line = await reader.readline()
-                if not line:
+                command = await self._commands.get()
+                if command is None:
                     break
 
-                command = json.loads(line.decode().strip())
+                if isinstance(command, Exception):
+                    raise command
                 response = await self._handle_command(command)
                 self._send_response(response)
 
-            except json.JSONDecodeError as e:
+            except msgspec.ValidationError as e:
+                self._send_response({"error": f"Invalid request: {e}"})
+            except msgspec.DecodeError as e:
                 self._send_response({"error": f"Invalid JSON: {e}"})
             except Exception as e:
                 logger.error(f"Command error: {e}")
                 self._send_response({"error": str(e)})
 
-    async def _handle_command(self, command: dict[str, Any]) -> dict[str, Any]:
-        """Handle a JSON-RPC command."""
-        method = command.get("method", "")
-        params = command.get("params", {})
-        request_id = command.get("id")
-
-        result: Any = None
-
-        if method == "get_status":
-            result = self.deck_link.get_status()
-            result["local_info"] = self.discovery.get_local_info()
-
-        elif method == "get_peers":
-            peers = self.discovery.get_peers()
-            result = [
-                {
-                    "name": p.display_name,
-                    "host": p.host,
-                    "port": p.port,
-                    "device_type": p.device_type,
-                }
-                for p in peers
-            ]
-
-        elif method == "connect":
-            host = params.get("host", "")
-            port = params.get("port", PORT)
-            await self.deck_link.connect_to(host, port)
-            result = {"status": "connecting"}
-
-        elif method == "submit_passphrase":
-            passphrase = params.get("passphrase", "")
-            await self.deck_link.submit_passphrase(passphrase)
-            result = {"status": "submitted"}
-
-        elif method == "disconnect":
-            await self.deck_link.disconnect_peer()
-            result = {"status": "disconnected"}
-
-        elif method == "send_notification":
-            title = params.get("title", "")
-            body = params.get("body", "")
-            await self.deck_link.send_notification(title, body)
-            result = {"status": "sent"}
-
-        elif method == "ping":
-            result = {"pong": True}
-
-        else:
-            return {"error": f"Unknown method: {method}", "id": request_id}
+        loop.remove_reader(fd)
+        self._running = False
+        self._flush_task.cancel()
+        self._flush_task = None
+        self._write()
 
-        return {"result": result, "id": request_id}
+    def _on_stdin_readable(self, loop: asyncio.AbstractEventLoop, fd: int) -> None:
+        """Read available stdin and queue every complete line."""
+        try:
+            data = os.read(fd, STDIN_READ_SIZE)
+        except BlockingIOError:
+            return
+
+        scan_from = len(self._stdin_buf)
+        if data:
+            self._stdin_buf += data
+            self._queue_lines(scan_from)
+            return
+
+        # EOF: Tauri closed our stdin; a final unterminated line still counts
+        loop.remove_reader(fd)
+        if self._stdin_buf.strip():
+            self._stdin_buf += b"\n"
+            self._queue_lines(scan_from)
+        self._commands.put_nowait(None)
+
+    def _queue_lines(self, scan_from: int) -> None:
+        """Parse each complete line in the stdin buffer and queue it."""
+        buf = self._stdin_buf
+        start = 0
+        end = buf.find(b"\n", scan_from)
+        if end < 0:
+            return
+
+        with memoryview(buf) as view:
+            while end >= 0:
+                with view[start:end] as line:
+                    try:
+                        self._commands.put_nowait(self._decoder.decode(line))
+                    except msgspec.DecodeError as e:
+                        self._commands.put_nowait(e)
+                start = end + 1
+                end = buf.find(b"\n", start)
+
+        del buf[:start]
+
+    async def _handle_command(self, command: RpcFrame) -> dict[str, Any]:
+        """Handle a JSON-RPC command."""
+        handler = self._handlers.get(command.method)
+        if handler is None:
+            return {"error": f"Unknown method: {command.method}", "id": command.id}
+
+        result = await handler(command.params)
+        return {"result": result, "id": command.id}
+
+    async def _h_get_status(self, params: dict[str, Any]) -> Any:
+        """Current connection status plus local service info."""
+        return {
+            **self.deck_link.get_status(),
+            "local_info": self.discovery.get_local_info(),
+        }
+
+    async def _h_get_peers(self, params: dict[str, Any]) -> Any:
+        """Peers currently visible via mDNS."""
+        return [
+            {
+                "name": p.display_name,
+                "host": p.host,
+                "port": p.port,
+                "device_type": p.device_type,
+            }
+            for p in self.discovery.get_peers()
+        ]
+
+    async def _h_connect(self, params: dict[str, Any]) -> Any:
+        """Start connecting to a peer."""
+        host = params.get("host", "")
+        port = params.get("port", PORT)
+        await self.deck_link.connect_to(host, port)
+        return {"status": "connecting"}
+
+    async def _h_submit_passphrase(self, params: dict[str, Any]) -> Any:
+        """Submit the passphrase the user entered."""
+        passphrase = params.get("passphrase", "")
+        await self.deck_link.submit_passphrase(passphrase)
+        return {"status": "submitted"}
+
+    async def _h_disconnect(self, params: dict[str, Any]) -> Any:
+        """Disconnect from the current peer."""
+        await self.deck_link.disconnect_peer()
+        return {"status": "disconnected"}
+
+    async def _h_send_notification(self, params: dict[str, Any]) -> Any:
+        """Send a notification to the connected peer."""
+        title = params.get("title", "")
+        body = params.get("body", "")
+        await self.deck_link.send_notification(title, body)
+        return {"status": "sent"}
+
+    async def _h_ping(self, params: dict[str, Any]) -> Any:
+        """Liveness check for the IPC channel."""
+        return {"pong": True}
+
+    def _encode(self, message: dict[str, Any]) -> bytes:
+        """Encode a message as a single JSON line."""
+        return self._encoder.encode(message) + b"\n"
+
+    def _write(self, line: bytes = b"") -> None:
+        """Write pending events, then line, to stdout with a single flush."""
+        if self._pending_events:
+            self._pending_events.append(line)
+            line = b"".join(self._pending_events)
+            self._pending_events.clear()
+        self._events_ready.clear()
+
+        if line:
+            self._stdout.write(line)
+            self._stdout.flush()
 
     def _send_response(self, response: dict[str, Any]) -> None:
         """Send a JSON response to stdout."""
-        print(json.dumps(response), flush=True)
+        self._write(self._encode(response))
+
+    async def _flush_events(self) -> None:
+        """Write pending events in bursts, one flush per burst."""
+        while True:
+            await self._events_ready.wait()
+            await asyncio.sleep(EVENT_FLUSH_INTERVAL)
+            self._write()
 
     def send_event(self, event: str, data: dict[str, Any]) -> None:
         """Send an event notification to Tauri."""
-        self._send_response(
+        line = self._encode(
             {
                 "event": event,
                 "data": data,
             }
         )
+        if not self._running or event in IMMEDIATE_EVENTS:
+            self._write(line)
+            return
+
+        self._pending_events.append(line)
+        if len(self._pending_events) >= EVENT_BATCH_MAX:
+            self._write()
+        else:
+            self._events_ready.set()
 
 
 def get_device_name() -> str:
@@ -131,17 +268,20 @@ def get_device_name() -> str:
     return hostname
 
 
-def create_event_handler(rpc_server: Optional[JsonRpcServer]) -> Any:
-    """Create an event handler that forwards to JSON-RPC."""
+class _EventForwarder:
+    """Event handler that forwards to JSON-RPC once a target is attached."""
+
+    __slots__ = ("target",)
+
+    def __init__(self) -> None:
+        self.target: Optional[JsonRpcServer] = None
 
-    def handler(event: str, data: dict[str, Any]) -> None:
-        if rpc_server:
-            rpc_server.send_event(event, data)
+    def __call__(self, event: str, data: dict[str, Any]) -> None:
+        if self.target:
+            self.target.send_event(event, data)
         else:
             logger.info(f"Event: {event} - {data}")
 
-    return handler
-
 
 @click.group()
 def cli() -> None:
@@ -159,14 +299,14 @@ def run(mode: str, name: Optional[str], port: int, ipc: bool) -> None:
     device_name = name or get_device_name()
 
     async def main() -> None:
-        rpc_server: Optional[JsonRpcServer] = None
+        forwarder = _EventForwarder()
 
         # Create server
         server = DeckLinkServer(
             device_name=device_name,
             device_type=mode,
             port=port,
-            on_event=create_event_handler(rpc_server),
+            on_event=forwarder,
         )
 
         # Create discovery
@@ -185,24 +325,33 @@ def run(mode: str, name: Optional[str], port: int, ipc: bool) -> None:
         if ipc:
             # IPC mode for Tauri
             rpc_server = JsonRpcServer(server, discovery)
-            # Update event handler
-            server.on_event = create_event_handler(rpc_server)
+            forwarder.target = rpc_server
             await rpc_server.start()
         else:
             # CLI mode - just keep running
             logger.info(f"Deck-Link running as {mode} '{device_name}' on port {port}")
             logger.info("Press Ctrl+C to stop")
 
+            # Sleep until Ctrl+C instead of waking the loop on a timer
+            shutdown = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(sig, shutdown.set)
+                except NotImplementedError:
+                    # No loop signal support (Windows); Ctrl+C cancels instead
+                    pass
+
             try:
-                while True:
-                    await asyncio.sleep(1)
-            except KeyboardInterrupt:
+                await shutdown.wait()
+            except (KeyboardInterrupt, asyncio.CancelledError):
                 pass
 
         # Cleanup
         await discovery.stop()
         await server.stop()
 
+    DeckLinkServer.use_uvloop()
     asyncio.run(main())
 
 
@@ -210,11 +359,12 @@ def run(mode: str, name: Optional[str], port: int, ipc: bool) -> None:
 @click.option("--timeout", default=5.0, help="Discovery timeout in seconds")
 def scan(timeout: float) -> None:
     """Scan for Deck-Link peers on the network."""
-    from .discovery import discover_peers_once
+    from .discovery import close_shared_zeroconf, discover_peers_once
 
     async def main() -> None:
         click.echo(f"Scanning for {timeout} seconds...")
         peers = await discover_peers_once(timeout)
+        await close_shared_zeroconf()
 
         if peers:
             click.echo(f"\nFound {len(peers)} peer(s):")
@@ -285,6 +435,7 @@ def connect(host: str, port: int) -> None:
 
         await server.stop()
 
+    DeckLinkServer.use_uvloop()
     asyncio.run(main())
 
 
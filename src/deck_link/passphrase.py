@@ -1,5 +1,7 @@
 """Random passphrase generator for connection authentication."""
 
+import hashlib
+import hmac
 import random
 
 # Curated word list - tech/nerd themed, easy to read and type
@@ -214,12 +216,23 @@ def generate_passphrase_multi(num_words: int = 2, separator: str = "-") -> str:
     return separator.join(words)
 
 
+def passphrase_digest(passphrase: str) -> bytes:
+    """
+    Digest of a passphrase for constant-time comparison.
+    Case-insensitive and ignores surrounding whitespace.
+    """
+    normalized = passphrase.strip().lower().encode()
+    return hashlib.blake2b(normalized, digest_size=16).digest()
+
+
 def validate_passphrase(input_passphrase: str, expected_passphrase: str) -> bool:
     """
     Validate a passphrase input against the expected value.
     Case-insensitive comparison with whitespace trimming.
     """
-    return input_passphrase.strip().lower() == expected_passphrase.strip().lower()
+    return hmac.compare_digest(
+        passphrase_digest(input_passphrase), passphrase_digest(expected_passphrase)
+    )
 
 
 if __name__ == "__main__":
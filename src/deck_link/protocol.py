@@ -1,9 +1,12 @@
 """Protocol definitions for Deck-Link communication."""
 
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Optional
-from pydantic import BaseModel, Field
+import functools
+from typing import Any, Iterable, Iterator, Optional
 import msgpack  # type: ignore
+import orjson
+import struct
 import time
 import uuid
 
@@ -33,6 +36,19 @@ class MessageType(str, Enum):
     ERROR = "error"
 
 
+# Decoded type strings map straight onto the canonical members, so handlers
+# can dispatch on identity (msg.type is MessageType.PING)
+_MESSAGE_TYPES: dict[str, MessageType] = {m.value: m for m in MessageType}
+
+
+def _message_type(value: str) -> MessageType:
+    """Look up the MessageType member for a wire value."""
+    try:
+        return _MESSAGE_TYPES[value]
+    except KeyError:
+        raise ValueError(f"Unknown message type: {value!r}") from None
+
+
 class ConnectionState(str, Enum):
     """States of a connection."""
 
@@ -44,41 +60,72 @@ class ConnectionState(str, Enum):
     ERROR = "error"
 
 
-class Message(BaseModel):
+# Shared packer; messages go on the wire as [type, session_id, timestamp, payload]
+_PACKER = msgpack.Packer(use_bin_type=True, autoreset=True)
+
+
+@dataclass(slots=True)
+class Message:
     """Base message structure for all communication."""
 
     type: MessageType
-    session_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    timestamp: float = Field(default_factory=time.time)
-    payload: dict[str, Any] = Field(default_factory=dict)
+    session_id: str
+    timestamp: float
+    payload: dict[str, Any] = field(default_factory=dict)
 
     def to_bytes(self) -> bytes:
         """Serialize message to msgpack bytes."""
-        return msgpack.packb(self.model_dump(), use_bin_type=True)
+        return _PACKER.pack(
+            (self.type.value, self.session_id, self.timestamp, self.payload)
+        )
 
     @classmethod
     def from_bytes(cls, data: bytes) -> "Message":
         """Deserialize message from msgpack bytes."""
-        unpacked = msgpack.unpackb(data, raw=False)
-        return cls(**unpacked)
+        type_, session_id, timestamp, payload = msgpack.unpackb(data, raw=False)
+        return cls(_message_type(type_), session_id, timestamp, payload or {})
 
     def to_json(self) -> str:
         """Serialize to JSON string (for WebSocket text frames)."""
-        return self.model_dump_json()
+        return orjson.dumps(
+            {
+                "type": self.type.value,
+                "session_id": self.session_id,
+                "timestamp": self.timestamp,
+                "payload": self.payload,
+            }
+        ).decode()
 
     @classmethod
-    def from_json(cls, data: str) -> "Message":
+    def from_json(cls, data: str | bytes) -> "Message":
         """Deserialize from JSON string."""
-        return cls.model_validate_json(data)
+        obj = orjson.loads(data)
+        return cls(
+            _message_type(obj["type"]),
+            obj["session_id"],
+            obj["timestamp"],
+            obj.get("payload") or {},
+        )
 
 
 # Convenience factory functions for common messages
+#
+# Only messages that start a new exchange (connection_request, ping) mint a
+# session id; everything else carries the id of the exchange it belongs to,
+# so the hot paths never pay for uuid4().
+
+
+def new_session_id() -> str:
+    """Generate a session id for a new exchange."""
+    return str(uuid.uuid4())
 
 
 def connection_request(sender_name: str, sender_ip: str, sender_port: int) -> Message:
     """Create a connection request message."""
     return Message(
         type=MessageType.CONNECTION_REQUEST,
+        session_id=new_session_id(),
+        timestamp=time.time(),
         payload={
             "sender_name": sender_name,
             "sender_ip": sender_ip,
@@ -92,6 +139,7 @@ def challenge_response(session_id: str, receiver_name: str) -> Message:
     return Message(
         type=MessageType.CHALLENGE_RESPONSE,
         session_id=session_id,
+        timestamp=time.time(),
         payload={
             "receiver_name": receiver_name,
             "message": "Enter the passphrase shown on the other device",
@@ -104,6 +152,7 @@ def auth_attempt(session_id: str, passphrase: str) -> Message:
     return Message(
         type=MessageType.AUTH_ATTEMPT,
         session_id=session_id,
+        timestamp=time.time(),
         payload={
             "passphrase": passphrase,
         },
@@ -115,6 +164,7 @@ def auth_result(session_id: str, success: bool, message: str = "") -> Message:
     return Message(
         type=MessageType.AUTH_RESULT,
         session_id=session_id,
+        timestamp=time.time(),
         payload={
             "success": success,
             "message": message,
@@ -122,28 +172,44 @@ def auth_result(session_id: str, success: bool, message: str = "") -> Message:
     )
 
 
-def ping() -> Message:
-    """Create a ping message."""
-    return Message(type=MessageType.PING)
+def ping(seq: int = 0) -> Message:
+    """Create a ping message; the peer echoes seq back in its pong."""
+    return Message(
+        type=MessageType.PING,
+        session_id=new_session_id(),
+        timestamp=time.time(),
+        payload={"seq": seq},
+    )
 
 
-def pong(ping_session_id: str) -> Message:
+def pong(ping_session_id: str, seq: int = 0) -> Message:
     """Create a pong message in response to a ping."""
     return Message(
         type=MessageType.PONG,
         session_id=ping_session_id,
+        timestamp=time.time(),
+        payload={"seq": seq},
     )
 
 
-def disconnect(reason: str = "User requested disconnect") -> Message:
+def disconnect(
+    reason: str = "User requested disconnect", session_id: str = ""
+) -> Message:
     """Create a disconnect message."""
-    return Message(type=MessageType.DISCONNECT, payload={"reason": reason})
+    return Message(
+        type=MessageType.DISCONNECT,
+        session_id=session_id,
+        timestamp=time.time(),
+        payload={"reason": reason},
+    )
 
 
-def error(message: str, code: str = "UNKNOWN") -> Message:
+def error(message: str, code: str = "UNKNOWN", session_id: str = "") -> Message:
     """Create an error message."""
     return Message(
         type=MessageType.ERROR,
+        session_id=session_id,
+        timestamp=time.time(),
         payload={
             "message": message,
             "code": code,
@@ -151,13 +217,182 @@ def error(message: str, code: str = "UNKNOWN") -> Message:
     )
 
 
-def notification(title: str, body: str, icon: Optional[str] = None) -> Message:
+def notification(
+    title: str, body: str, icon: Optional[str] = None, session_id: str = ""
+) -> Message:
     """Create a notification message."""
     return Message(
         type=MessageType.NOTIFICATION,
+        session_id=session_id,
+        timestamp=time.time(),
         payload={
             "title": title,
             "body": body,
             "icon": icon,
         },
     )
+
+
+# Pre-encoded frames for the heartbeat hot path
+#
+# Ping and pong always have the same shape, so they are packed once with a
+# placeholder session id and only the id, timestamp and seq bytes are patched
+# in per call. uuid4 strings are always 36 ASCII characters and seq is packed
+# as a full-width uint32 at the very end, which keeps the offsets fixed.
+
+_SID_LEN = 36
+_FLOAT64 = struct.Struct(">d")
+_UINT32 = struct.Struct(">I")
+_SEQ_MAX = 0xFFFFFFFF  # largest seq; also packs as a full-width uint32
+
+
+def valid_seq(value: Any) -> bool:
+    """Whether a received seq fits the uint32 the heartbeat frames carry."""
+    return type(value) is int and 0 <= value <= _SEQ_MAX
+
+
+def _frame_template(msg_type: MessageType) -> tuple[bytes, int, int]:
+    """Pack a heartbeat frame and locate its session id and timestamp."""
+    placeholder = "0" * _SID_LEN
+    frame = _PACKER.pack((msg_type.value, placeholder, 0.0, {"seq": _SEQ_MAX}))
+    sid_at = frame.index(placeholder.encode())
+    # The timestamp follows the session id, after its one-byte float64 marker
+    return frame, sid_at, sid_at + _SID_LEN + 1
+
+
+def _patch_frame(
+    template: tuple[bytes, int, int],
+    session_id: bytes,
+    seq: int,
+    timestamp: Optional[float] = None,
+) -> bytes:
+    """Copy a frame template with a new session id, seq and timestamp."""
+    frame, sid_at, ts_at = template
+    buf = bytearray(frame)
+    buf[sid_at : sid_at + _SID_LEN] = session_id
+    _FLOAT64.pack_into(buf, ts_at, time.time() if timestamp is None else timestamp)
+    _UINT32.pack_into(buf, len(buf) - _UINT32.size, seq & _SEQ_MAX)
+    return bytes(buf)
+
+
+_PING_TEMPLATE = _frame_template(MessageType.PING)
+_PONG_TEMPLATE = _frame_template(MessageType.PONG)
+
+
+def ping_bytes(seq: int = 0, session_id: Optional[str] = None) -> bytes:
+    """Encoded ping frame; same wire format as ping(seq).to_bytes()."""
+    if not session_id:
+        return _patch_frame(_PING_TEMPLATE, new_session_id().encode(), seq)
+    sid = session_id.encode()
+    if len(sid) != _SID_LEN:
+        # Not a uuid4 string, so it does not fit the template
+        msg = ping(seq & _SEQ_MAX)
+        msg.session_id = session_id
+        return msg.to_bytes()
+    return _patch_frame(_PING_TEMPLATE, sid, seq)
+
+
+def pong_bytes(
+    ping_session_id: str, seq: int = 0, timestamp: Optional[float] = None
+) -> bytes:
+    """Encoded pong frame; same wire format as pong(...).to_bytes()."""
+    session_id = ping_session_id.encode()
+    if len(session_id) != _SID_LEN:
+        # Not a uuid4 string, so it does not fit the template
+        msg = pong(ping_session_id, seq & _SEQ_MAX)
+        if timestamp is not None:
+            msg.timestamp = timestamp
+        return msg.to_bytes()
+    return _patch_frame(_PONG_TEMPLATE, session_id, seq, timestamp)
+
+
+# A connection request's payload is fixed for a given sender, so its packed
+# form is cached and only the session id and timestamp are packed per call.
+
+_CONNECTION_REQUEST_HEAD = _PACKER.pack_array_header(4) + _PACKER.pack(
+    MessageType.CONNECTION_REQUEST.value
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _connection_request_payload(
+    sender_name: str, sender_ip: str, sender_port: int
+) -> bytes:
+    """Packed connection request payload for a sender."""
+    return _PACKER.pack(
+        {
+            "sender_name": sender_name,
+            "sender_ip": sender_ip,
+            "sender_port": sender_port,
+        }
+    )
+
+
+def connection_request_bytes(
+    session_id: str, sender_name: str, sender_ip: str, sender_port: int
+) -> bytes:
+    """Encoded connection request; same wire format as connection_request()."""
+    return b"".join(
+        (
+            _CONNECTION_REQUEST_HEAD,
+            _PACKER.pack(session_id),
+            _PACKER.pack(time.time()),
+            _connection_request_payload(sender_name, sender_ip, sender_port),
+        )
+    )
+
+
+# Errors are sent straight from the packed fields, without building a Message.
+# Fixed errors can pack their payload once and reuse it with error_frame().
+
+_ERROR_HEAD = _PACKER.pack_array_header(4) + _PACKER.pack(MessageType.ERROR.value)
+
+
+def error_payload(message: str, code: str = "UNKNOWN") -> bytes:
+    """Packed error payload, for reuse with error_frame()."""
+    return _PACKER.pack({"message": message, "code": code})
+
+
+def error_frame(payload: bytes, session_id: str = "") -> bytes:
+    """Encoded error around a payload from error_payload()."""
+    return b"".join(
+        (_ERROR_HEAD, _PACKER.pack(session_id), _PACKER.pack(time.time()), payload)
+    )
+
+
+# Batched frames
+#
+# When several frames are queued at once they go out as a single websocket
+# message: the 0xc1 marker byte, which msgpack never emits, followed by each
+# frame prefixed with its length as a big-endian uint32.
+
+BATCH_MARKER = 0xC1
+_BATCH_HEAD = bytes((BATCH_MARKER,))
+# Bytes a batch adds: the marker once, then a length prefix per frame
+BATCH_HEAD_SIZE = len(_BATCH_HEAD)
+BATCH_FRAME_OVERHEAD = _UINT32.size
+
+
+def pack_batch(frames: Iterable[bytes]) -> bytes:
+    """Merge encoded frames into one batch message."""
+    parts = [_BATCH_HEAD]
+    for frame in frames:
+        parts.append(_UINT32.pack(len(frame)))
+        parts.append(frame)
+    return b"".join(parts)
+
+
+def iter_frames(data: bytes) -> Iterator[bytes]:
+    """Yield the encoded frames in a received message, unpacking batches."""
+    if not data or data[0] != BATCH_MARKER:
+        yield data
+        return
+
+    pos, end = 1, len(data)
+    while pos < end:
+        (size,) = _UINT32.unpack_from(data, pos)
+        pos += _UINT32.size
+        if pos + size > end:
+            raise ValueError("Truncated batch frame")
+        yield data[pos : pos + size]
+        pos += size
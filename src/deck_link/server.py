@@ -1,10 +1,11 @@
 """WebSocket server for Deck-Link communication."""
 
 import asyncio
-import json
+import hmac
 import logging
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Iterator, Optional
 from websockets.server import serve, WebSocketServerProtocol  # type: ignore
 from websockets.client import connect, WebSocketClientProtocol  # type: ignore
 from websockets.exceptions import ConnectionClosed  # type: ignore
@@ -14,21 +15,76 @@ from .protocol import (
     Message,
     MessageType,
     ConnectionState,
-    connection_request,
+    connection_request_bytes,
+    new_session_id,
     challenge_response,
     auth_attempt,
     auth_result,
-    ping,
-    pong,
+    ping_bytes,
+    pong_bytes,
     disconnect,
-    error,
+    error_frame,
+    error_payload,
+    iter_frames,
+    pack_batch,
+    BATCH_FRAME_OVERHEAD,
+    BATCH_HEAD_SIZE,
+    valid_seq,
 )
-from .passphrase import generate_passphrase, validate_passphrase
+from .passphrase import generate_passphrase, passphrase_digest
 
 logger = logging.getLogger(__name__)
 
+# Queued notifications at which the oldest start being dropped, and the
+# level the queue must drain back to before the slowdown is reported over
+BACKPRESSURE_ENTER = 512
+BACKPRESSURE_EXIT = 16
+# Most queued frames the writer picks up per pass
+WRITE_BATCH_MAX = 16
+# Largest websocket message either side accepts; batches stay within it
+MAX_MESSAGE_SIZE = 2**20
+
+# Websocket settings shared by the server and client sides. Frames are small
+# msgpack messages, so per-message deflate costs more than it saves, and the
+# application heartbeat below replaces protocol-level pings.
+WS_OPTIONS: dict[str, Any] = {
+    "compression": None,
+    "max_size": MAX_MESSAGE_SIZE,
+    "max_queue": 64,
+    "write_limit": 2**20,
+    "ping_interval": None,
+    "ping_timeout": None,
+}
+
+# Inbound handshakes served at once; further ones are turned away as busy
+MAX_INBOUND_CONNECTIONS = 8
+# Seconds a new inbound connection has to send its connection request
+CONNECTION_REQUEST_TIMEOUT = 10.0
+# Seconds an inbound handshake may take in total, passphrase entry included
+HANDSHAKE_TIMEOUT = 120.0
+# Messages accepted from an inbound connection before it authenticates
+_HANDSHAKE_TYPES = frozenset((MessageType.CONNECTION_REQUEST, MessageType.AUTH_ATTEMPT))
+
+# Fixed rejection payloads, packed once; each send only packs the session id
+# and timestamp around them
+_ERR_BUSY = error_payload("Server busy", "BUSY")
+_ERR_ALREADY_CONNECTED = error_payload(
+    "Already connected to another peer", "ALREADY_CONNECTED"
+)
+_ERR_NO_SESSION = error_payload("No active session", "NO_SESSION")
+_ERR_INVALID_SESSION = error_payload("Invalid session", "INVALID_SESSION")
+
+# Bound once for the checks made on every send and heartbeat tick; inbound
+# MessageType members are already bound as the keys of the handler table
+_CONNECTED = ConnectionState.CONNECTED
+
+# Ping once the peer has been quiet this long (seconds)
+PING_INTERVAL = 5.0
+# Disconnect once the peer has been quiet this long (seconds)
+PING_TIMEOUT = 10.0
+
 
-@dataclass
+@dataclass(slots=True)
 class PeerInfo:
     """Information about a connected peer."""
 
@@ -38,7 +94,7 @@ class PeerInfo:
     websocket: Optional[WebSocketServerProtocol | WebSocketClientProtocol] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ConnectionSession:
     """Tracks an active connection session during authentication."""
 
@@ -46,10 +102,21 @@ class ConnectionSession:
     passphrase: str
     peer_info: Optional[PeerInfo] = None
     state: ConnectionState = ConnectionState.DISCONNECTED
+    passphrase_hash: bytes = b""  # passphrase_digest() of the expected passphrase
 
 
 EventCallback = Callable[[str, dict[str, Any]], None]
 
+# Inbound messages are handled inline: a connection's receive loop awaits
+# _handle_message, which awaits the handler directly. Handlers must never
+# wrap per-message work in create_task; a connection owns at most one receive
+# task and one writer task, however many messages it carries. Enforced by
+# tests/test_no_task_per_message.py.
+MessageHandler = Callable[
+    ["DeckLinkServer", Message, WebSocketServerProtocol | WebSocketClientProtocol],
+    Awaitable[None],
+]
+
 
 class DeckLinkServer:
     """
@@ -79,13 +146,58 @@ class DeckLinkServer:
             None
         )
 
+        # Snapshot served by get_status, kept current as the connection changes
+        self._status_cache: dict[str, Any] = {
+            "state": self._state.value,
+            "device_name": device_name,
+            "device_type": device_type,
+            "port": port,
+            "peer": None,
+            "session_id": None,
+        }
+
         # Server
         self._server: Optional[asyncio.Server] = None
         self._running = False
+        self._accept_sem = asyncio.Semaphore(MAX_INBOUND_CONNECTIONS)
+
+        # Receive loop for a connection we initiated
+        self._client_listen_task: Optional[asyncio.Task[None]] = None
+        # Socket closes started from sync code, kept until they finish
+        self._closing: set[asyncio.Task[None]] = set()
+
+        # Outgoing frames for the connected peer, sent by a single writer task.
+        # Control frames (heartbeat, auth) go first and are never dropped;
+        # notifications are shed oldest-first when the peer falls behind.
+        self._control_out: deque[bytes] = deque()
+        self._data_out: deque[bytes] = deque()
+        self._out_ready: Optional[asyncio.Event] = None
+        self._writer_task: Optional[asyncio.Task[None]] = None
+        self._backpressure = False
 
         # Ping/pong
-        self._ping_task: Optional[asyncio.Task[None]] = None
-        self._last_pong: float = 0
+        self._ping_handle: Optional[asyncio.TimerHandle] = None
+        self._last_activity: float = 0  # loop.time() of the last inbound message
+        self._last_rtt: Optional[float] = None
+        # Pings reuse one session id per connection and are numbered so each
+        # pong can be matched to the ping it answers
+        self._ping_session_id = ""
+        self._ping_seq = 0
+        self._inflight: dict[int, float] = {}  # seq -> loop.time() when sent
+
+    @staticmethod
+    def use_uvloop() -> bool:
+        """
+        Run new event loops on uvloop when it is installed.
+        Call before asyncio.run(); returns whether uvloop will be used.
+        """
+        try:
+            import uvloop  # type: ignore
+        except ImportError:
+            return False
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        return True
 
     @property
     def state(self) -> ConnectionState:
@@ -93,30 +205,51 @@ class DeckLinkServer:
 
     @property
     def is_connected(self) -> bool:
-        return self._state == ConnectionState.CONNECTED
+        return self._state is _CONNECTED
 
     @property
     def peer(self) -> Optional[PeerInfo]:
         return self._peer
 
+    @property
+    def _session_id(self) -> str:
+        """Session id reused for every message sent on this connection."""
+        return self._current_session.session_id if self._current_session else ""
+
     def _emit(self, event: str, data: dict[str, Any]) -> None:
         """Emit an event to the UI."""
-        logger.debug(f"Event: {event} - {data}")
+        logger.debug("Event: %s - %s", event, data)
         if self.on_event:
             self.on_event(event, data)
 
+    def _emit_lazy(self, event: str, build: Callable[[], dict[str, Any]]) -> None:
+        """Emit an event, building its data only if anyone will see it."""
+        if self.on_event is not None or logger.isEnabledFor(logging.DEBUG):
+            self._emit(event, build())
+
     def _set_state(self, state: ConnectionState) -> None:
         """Update connection state and notify UI."""
         old_state = self._state
         self._state = state
-        self._emit(
+        self._status_cache["state"] = state.value
+        self._refresh_status()
+        self._emit_lazy(
             "state_changed",
-            {
+            lambda: {
                 "old_state": old_state.value,
                 "new_state": state.value,
             },
         )
 
+    def _refresh_status(self) -> None:
+        """Update the cached status after the peer or session changes."""
+        peer = self._peer
+        self._status_cache["peer"] = (
+            {"name": peer.name, "ip": peer.ip, "port": peer.port} if peer else None
+        )
+        session = self._current_session
+        self._status_cache["session_id"] = session.session_id if session else None
+
     async def start(self) -> None:
         """Start the WebSocket server."""
         if self._running:
@@ -126,6 +259,7 @@ class DeckLinkServer:
             self._handle_connection,
             "0.0.0.0",
             self.port,
+            **WS_OPTIONS,
         )
         self._running = True
         logger.info(f"Server started on port {self.port}")
@@ -133,9 +267,21 @@ class DeckLinkServer:
 
     async def stop(self) -> None:
         """Stop the server and disconnect."""
-        if self._ping_task:
-            self._ping_task.cancel()
-            self._ping_task = None
+        current = asyncio.current_task()
+        tasks = [
+            task
+            for task in (self._writer_task, self._client_listen_task)
+            if task is not None and task is not current
+        ]
+        if self._ping_handle:
+            self._ping_handle.cancel()
+            self._ping_handle = None
+        self._client_listen_task = None
+        self._stop_writer()
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, *self._closing, return_exceptions=True)
 
         if self._websocket:
             await self._websocket.close()
@@ -150,6 +296,7 @@ class DeckLinkServer:
         self._set_state(ConnectionState.DISCONNECTED)
         self._peer = None
         self._current_session = None
+        self._refresh_status()
         logger.info("Server stopped")
         self._emit("server_stopped", {})
 
@@ -158,21 +305,113 @@ class DeckLinkServer:
         remote_addr = websocket.remote_address
         logger.info(f"Incoming connection from {remote_addr}")
 
+        if self._accept_sem.locked():
+            logger.warning("Too many connections - rejecting %s", remote_addr)
+            await self._send_error(websocket, _ERR_BUSY)
+            await websocket.close(code=1013, reason="Server busy")
+            return
+
         try:
-            async for raw_message in websocket:
-                if isinstance(raw_message, bytes):
-                    message = Message.from_bytes(raw_message)
+            # Only the unauthenticated handshake holds a slot
+            async with self._accept_sem:
+                authenticated = await self._serve_handshake(websocket)
+
+            if authenticated:
+                async for raw_message in websocket:
+                    await self._dispatch_raw(raw_message, websocket, is_server=True)
+                    if self._websocket is not websocket:
+                        # The message ended the connection
+                        break
                 else:
-                    message = Message.from_json(raw_message)
-
-                await self._handle_message(message, websocket, is_server=True)
+                    if self._websocket is websocket:
+                        # Peer closed cleanly without a disconnect message
+                        self._handle_disconnect()
         except ConnectionClosed:
             logger.info(f"Connection closed from {remote_addr}")
             if self._websocket == websocket:
                 self._handle_disconnect()
         except Exception as e:
             logger.error(f"Error handling connection: {e}")
-            self._handle_disconnect()
+            if self._websocket is websocket:
+                self._handle_disconnect()
+        finally:
+            await websocket.close()
+
+    async def _serve_handshake(self, websocket: WebSocketServerProtocol) -> bool:
+        """
+        Process messages on a new inbound connection until it authenticates.
+        Returns False if the socket was closed, including on a missed deadline.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        while self._websocket is not websocket:
+            # The longer deadline applies once this socket has a session
+            session = self._current_session
+            peer = session.peer_info if session else None
+            if peer and peer.websocket is websocket:
+                deadline = start + HANDSHAKE_TIMEOUT
+            else:
+                deadline = start + CONNECTION_REQUEST_TIMEOUT
+
+            try:
+                raw_message = await asyncio.wait_for(
+                    websocket.recv(), max(0.0, deadline - loop.time())
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Handshake timed out - closing %s", websocket.remote_address
+                )
+                await websocket.close(code=1008, reason="Handshake timed out")
+                return False
+
+            for message in self._decode_raw(raw_message):
+                if websocket.closed:
+                    return False
+                # Once authenticated, the rest of a batch is handled as usual
+                authenticated = self._websocket is websocket
+                if not authenticated and message.type not in _HANDSHAKE_TYPES:
+                    logger.warning(
+                        "Unexpected %s during handshake - closing %s",
+                        message.type,
+                        websocket.remote_address,
+                    )
+                    await websocket.close(code=1008, reason="Not authenticated")
+                    return False
+                await self._handle_message(message, websocket, is_server=True)
+            if websocket.closed:
+                return False
+
+        return True
+
+    async def _dispatch_raw(
+        self,
+        raw_message: str | bytes,
+        websocket: WebSocketServerProtocol | WebSocketClientProtocol,
+        is_server: bool,
+    ) -> None:
+        """Decode a received websocket message and handle each frame in it."""
+        for message in self._decode_raw(raw_message):
+            await self._handle_message(message, websocket, is_server)
+
+    @staticmethod
+    def _decode_raw(raw_message: str | bytes) -> Iterator[Message]:
+        """Decode the messages in a received websocket message."""
+        if isinstance(raw_message, bytes):
+            for frame in iter_frames(raw_message):
+                yield Message.from_bytes(frame)
+        else:
+            # Text frame from a peer still using JSON framing
+            yield Message.from_json(raw_message)
+
+    async def _send_error(
+        self,
+        websocket: WebSocketServerProtocol | WebSocketClientProtocol,
+        payload: bytes,
+        session_id: str = "",
+    ) -> None:
+        """Send an error straight to a socket that may not have a writer yet."""
+        await websocket.send(error_frame(payload, session_id))
 
     async def _handle_message(
         self,
@@ -181,34 +420,17 @@ class DeckLinkServer:
         is_server: bool,
     ) -> None:
         """Process an incoming message based on type and current state."""
-        logger.debug(f"Received: {message.type.value}")
-
-        if message.type == MessageType.CONNECTION_REQUEST:
-            await self._handle_connection_request(message, websocket)
-
-        elif message.type == MessageType.CHALLENGE_RESPONSE:
-            await self._handle_challenge_response(message)
-
-        elif message.type == MessageType.AUTH_ATTEMPT:
-            await self._handle_auth_attempt(message, websocket)
-
-        elif message.type == MessageType.AUTH_RESULT:
-            await self._handle_auth_result(message, websocket)
-
-        elif message.type == MessageType.PING:
-            await self._handle_ping(message, websocket)
-
-        elif message.type == MessageType.PONG:
-            self._handle_pong(message)
-
-        elif message.type == MessageType.DISCONNECT:
-            self._handle_disconnect()
-
-        elif message.type == MessageType.NOTIFICATION:
-            self._emit("notification", message.payload)
+        logger.debug("Received: %s", message.type)
+        if websocket is self._websocket:
+            # Only the connected peer's traffic shows that it is alive
+            self._last_activity = asyncio.get_running_loop().time()
+
+        handler = self._HANDLERS.get(message.type)
+        if handler is None:
+            logger.warning("Unhandled message type: %s", message.type)
+            return
 
-        else:
-            logger.warning(f"Unhandled message type: {message.type}")
+        await handler(self, message, websocket)
 
     async def _handle_connection_request(
         self,
@@ -218,8 +440,10 @@ class DeckLinkServer:
         """Handle incoming connection request - generate challenge."""
         if self._state == ConnectionState.CONNECTED:
             # Already connected, reject
-            err = error("Already connected to another peer", "ALREADY_CONNECTED")
-            await websocket.send(err.to_json())
+            await self._send_error(
+                websocket, _ERR_ALREADY_CONNECTED, message.session_id
+            )
+            await websocket.close()
             return
 
         # Generate passphrase for challenge
@@ -228,6 +452,7 @@ class DeckLinkServer:
         self._current_session = ConnectionSession(
             session_id=message.session_id,
             passphrase=passphrase,
+            passphrase_hash=passphrase_digest(passphrase),
             peer_info=PeerInfo(
                 name=message.payload.get("sender_name", "Unknown"),
                 ip=message.payload.get("sender_ip", ""),
@@ -239,9 +464,9 @@ class DeckLinkServer:
         self._set_state(ConnectionState.CHALLENGE_SENT)
 
         # Notify UI to display passphrase
-        self._emit(
+        self._emit_lazy(
             "challenge_generated",
-            {
+            lambda: {
                 "session_id": message.session_id,
                 "passphrase": passphrase,
                 "peer_name": message.payload.get("sender_name", "Unknown"),
@@ -250,9 +475,13 @@ class DeckLinkServer:
 
         # Send challenge response (without passphrase - that's shown on screen)
         response = challenge_response(message.session_id, self.device_name)
-        await websocket.send(response.to_json())
+        await websocket.send(response.to_bytes())
 
-    async def _handle_challenge_response(self, message: Message) -> None:
+    async def _handle_challenge_response(
+        self,
+        message: Message,
+        websocket: WebSocketClientProtocol,
+    ) -> None:
         """Handle challenge response - prompt user for passphrase input."""
         if self._state != ConnectionState.AWAITING_CHALLENGE:
             logger.warning("Unexpected challenge response")
@@ -261,9 +490,9 @@ class DeckLinkServer:
         self._set_state(ConnectionState.AWAITING_AUTH_INPUT)
 
         # Notify UI to show passphrase input
-        self._emit(
+        self._emit_lazy(
             "passphrase_required",
-            {
+            lambda: {
                 "session_id": message.session_id,
                 "peer_name": message.payload.get("receiver_name", "Unknown"),
             },
@@ -276,29 +505,29 @@ class DeckLinkServer:
     ) -> None:
         """Handle authentication attempt - verify passphrase."""
         if not self._current_session:
-            err = error("No active session", "NO_SESSION")
-            await websocket.send(err.to_json())
+            await self._send_error(websocket, _ERR_NO_SESSION, message.session_id)
             return
 
         if message.session_id != self._current_session.session_id:
-            err = error("Invalid session", "INVALID_SESSION")
-            await websocket.send(err.to_json())
+            await self._send_error(websocket, _ERR_INVALID_SESSION, message.session_id)
             return
 
         input_passphrase = message.payload.get("passphrase", "")
+        input_hash = passphrase_digest(input_passphrase)
 
-        if validate_passphrase(input_passphrase, self._current_session.passphrase):
+        if hmac.compare_digest(input_hash, self._current_session.passphrase_hash):
             # Success!
             self._websocket = websocket
+            self._start_writer(websocket)
             self._peer = self._current_session.peer_info
             self._set_state(ConnectionState.CONNECTED)
 
             result = auth_result(message.session_id, True, "Connected!")
-            await websocket.send(result.to_json())
+            self._send(result.to_bytes())
 
-            self._emit(
+            self._emit_lazy(
                 "connected",
-                {
+                lambda: {
                     "peer_name": self._peer.name if self._peer else "Unknown",
                     "peer_ip": self._peer.ip if self._peer else "",
                 },
@@ -309,11 +538,11 @@ class DeckLinkServer:
         else:
             # Failed
             result = auth_result(message.session_id, False, "Incorrect passphrase")
-            await websocket.send(result.to_json())
+            await websocket.send(result.to_bytes())
 
-            self._emit(
+            self._emit_lazy(
                 "auth_failed",
-                {
+                lambda: {
                     "reason": "Incorrect passphrase",
                 },
             )
@@ -321,6 +550,10 @@ class DeckLinkServer:
             # Reset state
             self._set_state(ConnectionState.DISCONNECTED)
             self._current_session = None
+            self._refresh_status()
+
+            # The peer has to start over with a new connection
+            await websocket.close()
 
     async def _handle_auth_result(
         self,
@@ -332,11 +565,12 @@ class DeckLinkServer:
 
         if success:
             self._websocket = websocket
+            self._start_writer(websocket)
             self._set_state(ConnectionState.CONNECTED)
 
-            self._emit(
+            self._emit_lazy(
                 "connected",
-                {
+                lambda: {
                     "peer_name": self._peer.name if self._peer else "Unknown",
                     "peer_ip": self._peer.ip if self._peer else "",
                 },
@@ -346,9 +580,9 @@ class DeckLinkServer:
             self._start_ping_loop()
         else:
             self._set_state(ConnectionState.ERROR)
-            self._emit(
+            self._emit_lazy(
                 "auth_failed",
-                {
+                lambda: {
                     "reason": message.payload.get("message", "Authentication failed"),
                 },
             )
@@ -358,52 +592,247 @@ class DeckLinkServer:
         message: Message,
         websocket: WebSocketServerProtocol | WebSocketClientProtocol,
     ) -> None:
-        """Respond to ping with pong."""
-        response = pong(message.session_id)
-        await websocket.send(response.to_json())
+        """Respond to ping with pong, echoing its sequence number."""
+        if websocket is not self._websocket:
+            # Pongs go out through the connected peer's queue
+            logger.debug("Ignoring ping from a socket that is not the peer")
+            return
 
-    def _handle_pong(self, message: Message) -> None:
-        """Record pong received."""
-        import time
+        seq = message.payload.get("seq", 0)
+        if not valid_seq(seq):
+            # Malformed seq; still answer so the peer sees we are alive
+            seq = 0
+        self._send(pong_bytes(message.session_id, seq))
 
-        self._last_pong = time.time()
+    async def _handle_pong(
+        self,
+        message: Message,
+        websocket: WebSocketServerProtocol | WebSocketClientProtocol,
+    ) -> None:
+        """Record pong received and measure the round trip of its ping."""
+        now = asyncio.get_running_loop().time()
+
+        seq = message.payload.get("seq")
+        if seq is None:
+            # Peer does not echo sequence numbers; any pong answers them all
+            self._inflight.clear()
+            return
+        if not valid_seq(seq):
+            return
+
+        sent_at = self._inflight.pop(seq, None)
+        if sent_at is None:
+            return
+
+        self._last_rtt = now - sent_at
+        logger.debug("Pong %d, rtt %.1f ms", seq, self._last_rtt * 1000)
+        # Pongs arrive in order, so older pings will not be answered now
+        for stale in [s for s in self._inflight if s < seq]:
+            del self._inflight[stale]
+
+    async def _handle_peer_disconnect(
+        self,
+        message: Message,
+        websocket: WebSocketServerProtocol | WebSocketClientProtocol,
+    ) -> None:
+        """Peer announced it is disconnecting."""
+        self._handle_disconnect()
+
+    async def _handle_notification(
+        self,
+        message: Message,
+        websocket: WebSocketServerProtocol | WebSocketClientProtocol,
+    ) -> None:
+        """Forward a notification from the peer to the UI."""
+        self._emit("notification", message.payload)
+
+    # Inbound dispatch table: one dict lookup per message
+    _HANDLERS: dict[MessageType, MessageHandler] = {
+        MessageType.CONNECTION_REQUEST: _handle_connection_request,
+        MessageType.CHALLENGE_RESPONSE: _handle_challenge_response,
+        MessageType.AUTH_ATTEMPT: _handle_auth_attempt,
+        MessageType.AUTH_RESULT: _handle_auth_result,
+        MessageType.PING: _handle_ping,
+        MessageType.PONG: _handle_pong,
+        MessageType.DISCONNECT: _handle_peer_disconnect,
+        MessageType.NOTIFICATION: _handle_notification,
+    }
 
     def _handle_disconnect(self) -> None:
         """Handle disconnection."""
+        websocket = self._websocket
+        if websocket is not None and not websocket.closed:
+            self._close_soon(websocket)
+
         self._set_state(ConnectionState.DISCONNECTED)
         self._websocket = None
         self._peer = None
         self._current_session = None
+        self._refresh_status()
 
-        if self._ping_task:
-            self._ping_task.cancel()
-            self._ping_task = None
+        if self._ping_handle:
+            self._ping_handle.cancel()
+            self._ping_handle = None
+        self._inflight.clear()
+
+        if self._client_listen_task:
+            # Called from inside the listener when the peer goes away
+            if self._client_listen_task is not asyncio.current_task():
+                self._client_listen_task.cancel()
+            self._client_listen_task = None
+
+        self._stop_writer()
 
         self._emit("disconnected", {})
 
+    def _close_soon(
+        self, websocket: WebSocketServerProtocol | WebSocketClientProtocol
+    ) -> None:
+        """Close a socket from sync code, keeping the task until it is done."""
+        task = asyncio.get_running_loop().create_task(websocket.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def _start_writer(
+        self, websocket: WebSocketServerProtocol | WebSocketClientProtocol
+    ) -> None:
+        """Set up the outgoing queues and writer task for a new connection."""
+        self._stop_writer()
+        self._control_out = deque()
+        self._data_out = deque()
+        self._out_ready = asyncio.Event()
+        self._writer_task = asyncio.create_task(
+            self._writer_loop(
+                websocket, self._control_out, self._data_out, self._out_ready
+            )
+        )
+
+    def _stop_writer(self) -> None:
+        """Stop the writer task, discarding anything still queued."""
+        if self._writer_task:
+            self._writer_task.cancel()
+            self._writer_task = None
+        self._control_out.clear()
+        self._data_out.clear()
+        self._out_ready = None
+        self._backpressure = False
+
+    def _send(self, frame: bytes) -> None:
+        """Queue a control frame for the connected peer; these are never dropped."""
+        if self._out_ready is None:
+            logger.warning("Not connected - dropping outgoing message")
+            return
+
+        self._control_out.append(frame)
+        self._out_ready.set()
+
+    def _send_data(self, frame: bytes) -> None:
+        """Queue a notification frame, shedding the oldest one if the peer lags."""
+        if self._out_ready is None:
+            logger.warning("Not connected - dropping outgoing message")
+            return
+
+        if len(self._data_out) >= BACKPRESSURE_ENTER:
+            self._data_out.popleft()
+            if not self._backpressure:
+                self._backpressure = True
+                logger.warning("Peer is falling behind - dropping old notifications")
+                self._emit("backpressure", {"active": True})
+
+        self._data_out.append(frame)
+        self._out_ready.set()
+
+    @staticmethod
+    def _take_batch(control: deque[bytes], data: deque[bytes]) -> list[bytes]:
+        """
+        Pop the next frames to send, control first, as many as fit one message.
+        A frame too large to share a message is taken on its own.
+        """
+        batch: list[bytes] = []
+        size = BATCH_HEAD_SIZE
+        for queue in (control, data):
+            while queue and len(batch) < WRITE_BATCH_MAX:
+                size += BATCH_FRAME_OVERHEAD + len(queue[0])
+                if batch and size > MAX_MESSAGE_SIZE:
+                    return batch
+                batch.append(queue.popleft())
+        return batch
+
+    async def _writer_loop(
+        self,
+        websocket: WebSocketServerProtocol | WebSocketClientProtocol,
+        control: deque[bytes],
+        data: deque[bytes],
+        ready: asyncio.Event,
+    ) -> None:
+        """Send queued frames to the peer, control frames first."""
+        try:
+            while True:
+                await ready.wait()
+                ready.clear()
+
+                while control or data:
+                    batch = self._take_batch(control, data)
+
+                    # Several queued frames go out as one batch message
+                    await websocket.send(
+                        batch[0] if len(batch) == 1 else pack_batch(batch)
+                    )
+
+                    if self._backpressure and len(data) <= BACKPRESSURE_EXIT:
+                        self._backpressure = False
+                        logger.info("Peer caught up with notifications")
+                        self._emit("backpressure", {"active": False})
+        except ConnectionClosed:
+            # The receive loop notices the close and handles the disconnect
+            pass
+        except Exception as e:
+            logger.error(f"Send error: {e}")
+            self._handle_disconnect()
+
     def _start_ping_loop(self) -> None:
-        """Start the ping/pong heartbeat loop."""
+        """Start the ping/pong heartbeat, pinging only when the peer is quiet."""
+        if self._ping_handle:
+            self._ping_handle.cancel()
+
+        loop = asyncio.get_running_loop()
+        self._ping_session_id = new_session_id()
+        self._ping_seq = 0
+        self._inflight.clear()
+        self._last_activity = loop.time()
+        self._ping_handle = loop.call_later(PING_INTERVAL, self._send_ping_cb)
+
+    def _send_ping_cb(self) -> None:
+        """Heartbeat timer: drop a silent peer, ping a quiet one, then re-arm."""
+        self._ping_handle = None
+        if self._state is not _CONNECTED or not self._websocket:
+            return
 
-        async def ping_loop() -> None:
-            import time
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        idle = now - self._last_activity
+        if idle > PING_TIMEOUT:
+            logger.warning("Ping timeout - disconnecting")
+            self._handle_disconnect()
+            return
 
-            while self._state == ConnectionState.CONNECTED and self._websocket:
-                try:
-                    self._last_pong = time.time()
-                    await self._websocket.send(ping().to_json())
-                    await asyncio.sleep(5)
+        if self._inflight:
+            seq, sent_at = next(iter(self._inflight.items()))
+            if now - sent_at > PING_TIMEOUT:
+                logger.warning("Ping %d unanswered - disconnecting", seq)
+                self._handle_disconnect()
+                return
 
-                    # Check if pong was received
-                    if time.time() - self._last_pong > 10:
-                        logger.warning("Ping timeout - disconnecting")
-                        self._handle_disconnect()
-                        break
-                except Exception as e:
-                    logger.error(f"Ping error: {e}")
-                    self._handle_disconnect()
-                    break
+        if idle < PING_INTERVAL:
+            # Recent traffic already shows the peer is alive
+            delay = self._last_activity + PING_INTERVAL - now
+        else:
+            self._ping_seq += 1
+            self._inflight[self._ping_seq] = now
+            self._send(ping_bytes(self._ping_seq, self._ping_session_id))
+            delay = PING_INTERVAL
 
-        self._ping_task = asyncio.create_task(ping_loop())
+        self._ping_handle = loop.call_later(delay, self._send_ping_cb)
 
     # Client-side methods (for initiating connections)
 
@@ -416,28 +845,36 @@ class DeckLinkServer:
         self._set_state(ConnectionState.AWAITING_CHALLENGE)
 
         try:
-            uri = f"ws://{host}:{port}"
-            websocket = await connect(uri)
+            # IPv6 literals need brackets in a URI
+            uri_host = f"[{host}]" if ":" in host else host
+            uri = f"ws://{uri_host}:{port}"
+            websocket = await connect(uri, **WS_OPTIONS)
 
             self._peer = PeerInfo(name="", ip=host, port=port, websocket=websocket)
 
             # Send connection request
-            request = connection_request(
-                sender_name=self.device_name,
-                sender_ip="",  # Will be determined by receiver
-                sender_port=self.port,
+            session_id = new_session_id()
+            await websocket.send(
+                connection_request_bytes(
+                    session_id,
+                    sender_name=self.device_name,
+                    sender_ip="",  # Will be determined by receiver
+                    sender_port=self.port,
+                )
             )
-            await websocket.send(request.to_json())
 
             # Store session info
             self._current_session = ConnectionSession(
-                session_id=request.session_id,
+                session_id=session_id,
                 passphrase="",  # We don't know it yet
                 peer_info=self._peer,
             )
+            self._refresh_status()
 
             # Start listening for responses
-            asyncio.create_task(self._client_listen(websocket))
+            self._client_listen_task = asyncio.create_task(
+                self._client_listen(websocket)
+            )
 
         except Exception as e:
             logger.error(f"Connection failed: {e}")
@@ -448,18 +885,18 @@ class DeckLinkServer:
         """Listen for messages as a client."""
         try:
             async for raw_message in websocket:
-                if isinstance(raw_message, bytes):
-                    message = Message.from_bytes(raw_message)
-                else:
-                    message = Message.from_json(raw_message)
-
-                await self._handle_message(message, websocket, is_server=False)
+                await self._dispatch_raw(raw_message, websocket, is_server=False)
+            logger.info("Client connection closed")
         except ConnectionClosed:
             logger.info("Client connection closed")
-            self._handle_disconnect()
         except Exception as e:
             logger.error(f"Client error: {e}")
-            self._handle_disconnect()
+        finally:
+            if self._client_listen_task is asyncio.current_task():
+                # Still the active connection, so its end is a disconnect
+                self._handle_disconnect()
+            # Nobody else reads this socket once the listener is gone
+            await websocket.close()
 
     async def submit_passphrase(self, passphrase: str) -> None:
         """Submit passphrase (called from UI after user enters it)."""
@@ -472,14 +909,22 @@ class DeckLinkServer:
             return
 
         attempt = auth_attempt(self._current_session.session_id, passphrase)
-        await self._peer.websocket.send(attempt.to_json())
+        await self._peer.websocket.send(attempt.to_bytes())
 
     async def disconnect_peer(self) -> None:
         """Disconnect from current peer."""
-        if self._websocket:
+        websocket = self._websocket
+        if websocket:
+            # This side ends the connection, so the receive loops must not
+            # report the close as a disconnect of their own
+            self._websocket = None
+            self._client_listen_task = None
+            # Anything still queued is dropped; the disconnect goes out directly
+            self._stop_writer()
             try:
-                await self._websocket.send(disconnect().to_json())
-                await self._websocket.close()
+                msg = disconnect(session_id=self._session_id)
+                await websocket.send(msg.to_bytes())
+                await websocket.close()
             except Exception:
                 pass
 
@@ -493,24 +938,9 @@ class DeckLinkServer:
 
         from .protocol import notification
 
-        msg = notification(title, body)
-        await self._websocket.send(msg.to_json())
+        msg = notification(title, body, session_id=self._session_id)
+        self._send_data(msg.to_bytes())
 
     def get_status(self) -> dict[str, Any]:
         """Get current status for UI."""
-        return {
-            "state": self._state.value,
-            "device_name": self.device_name,
-            "device_type": self.device_type,
-            "port": self.port,
-            "peer": {
-                "name": self._peer.name,
-                "ip": self._peer.ip,
-                "port": self._peer.port,
-            }
-            if self._peer
-            else None,
-            "session_id": self._current_session.session_id
-            if self._current_session
-            else None,
-        }
+        return self._status_cache.copy()
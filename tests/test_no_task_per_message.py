@@ -0,0 +1,70 @@
+"""Inbound messages must be handled inline, never in a task per message."""
+
+import ast
+from pathlib import Path
+
+SERVER_PY = Path(__file__).resolve().parents[1] / "src" / "deck_link" / "server.py"
+TASK_SPAWNERS = {"create_task", "ensure_future"}
+
+
+def _server_class() -> ast.ClassDef:
+    tree = ast.parse(SERVER_PY.read_text(), filename=str(SERVER_PY))
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == "DeckLinkServer":
+            return node
+    raise AssertionError("DeckLinkServer not found in server.py")
+
+
+def _methods(cls: ast.ClassDef) -> dict[str, ast.AST]:
+    return {
+        node.name: node
+        for node in cls.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    }
+
+
+def _handler_table_targets(cls: ast.ClassDef) -> set[str]:
+    for node in cls.body:
+        if (
+            isinstance(node, ast.AnnAssign)
+            and isinstance(node.target, ast.Name)
+            and node.target.id == "_HANDLERS"
+            and isinstance(node.value, ast.Dict)
+        ):
+            return {v.id for v in node.value.values if isinstance(v, ast.Name)}
+    raise AssertionError("_HANDLERS table not found on DeckLinkServer")
+
+
+def _spawned_tasks(func: ast.AST) -> list[int]:
+    """Line numbers of create_task/ensure_future calls inside func."""
+    lines = []
+    for node in ast.walk(func):
+        if not isinstance(node, ast.Call):
+            continue
+        callee = node.func
+        name = callee.attr if isinstance(callee, ast.Attribute) else None
+        if isinstance(callee, ast.Name):
+            name = callee.id
+        if name in TASK_SPAWNERS:
+            lines.append(node.lineno)
+    return lines
+
+
+def test_handler_table_targets_exist() -> None:
+    cls = _server_class()
+    missing = _handler_table_targets(cls) - _methods(cls).keys()
+    assert not missing, f"_HANDLERS points at unknown methods: {sorted(missing)}"
+
+
+def test_handlers_do_not_spawn_tasks() -> None:
+    cls = _server_class()
+    methods = _methods(cls)
+    checked = {name for name in methods if name.startswith("_handle_")}
+    checked |= _handler_table_targets(cls)
+
+    offenders = {
+        name: lines
+        for name in sorted(checked)
+        if (lines := _spawned_tasks(methods[name]))
+    }
+    assert not offenders, f"Handlers spawning tasks (method: lines): {offenders}"
@@ -0,0 +1,68 @@
+"""Queued frames are merged into batches no larger than the peer accepts."""
+
+import asyncio
+from collections import deque
+
+from deck_link.protocol import BATCH_MARKER, iter_frames
+from deck_link.server import MAX_MESSAGE_SIZE, WRITE_BATCH_MAX, DeckLinkServer
+
+
+class RecordingSocket:
+    """Stands in for a websocket, keeping every message sent on it."""
+
+    def __init__(self) -> None:
+        self.sent: list[bytes] = []
+
+    async def send(self, message: bytes) -> None:
+        self.sent.append(message)
+
+
+def _write(control: list[bytes], data: list[bytes]) -> list[bytes]:
+    """Run the writer over the given queues and return the messages it sent."""
+
+    async def run() -> list[bytes]:
+        server = DeckLinkServer("test")
+        websocket = RecordingSocket()
+        ready = asyncio.Event()
+        ready.set()
+        writer = asyncio.create_task(
+            server._writer_loop(websocket, deque(control), deque(data), ready)
+        )
+        await asyncio.sleep(0)
+        writer.cancel()
+        await asyncio.gather(writer, return_exceptions=True)
+        return websocket.sent
+
+    return asyncio.run(run())
+
+
+def _received(messages: list[bytes]) -> list[bytes]:
+    return [frame for message in messages for frame in iter_frames(message)]
+
+
+def test_batches_fit_the_peer_message_limit() -> None:
+    frames = [bytes([i]) * 200_000 for i in range(10)]
+    sent = _write([], frames)
+
+    assert all(len(message) <= MAX_MESSAGE_SIZE for message in sent)
+    assert len(sent) > 1
+    assert _received(sent) == frames
+
+
+def test_oversized_frame_goes_out_alone() -> None:
+    small = [b"\x01" * 10, b"\x02" * 10]
+    huge = b"\x03" * (MAX_MESSAGE_SIZE + 1)
+    sent = _write([], [small[0], huge, small[1]])
+
+    assert huge in sent
+    assert _received(sent) == [small[0], huge, small[1]]
+
+
+def test_small_frames_share_a_batch() -> None:
+    control = [b"\x01" * 10]
+    data = [bytes([i]) * 10 for i in range(2, 2 + WRITE_BATCH_MAX)]
+    sent = _write(control, data)
+
+    assert sent[0][0] == BATCH_MARKER
+    assert len(list(iter_frames(sent[0]))) == WRITE_BATCH_MAX
+    assert _received(sent) == control + data